@@ -0,0 +1,199 @@
+"""Benchmark of the mode search and mode analysis cores. Each core is timed against a reference implementation that recomputes everything for each of the 12 tonics, and the results of both are checked to be identical before timing. The search is also timed on a generated catalogue of 10,240 definitions loaded from data files (2,048 distinct scales, every set of notes containing the tonic, each under 5 names), and repeated queries are timed with and without the query cache."""
+# Import necessary libraries and modules
+import csv
+import json
+import os
+import tempfile
+import timeit
+from common import get_all_scales, get_scale_notes, identify_chord, get_enharmonic_equivalent, intervals_to_mask, rotate_mask, mask_to_pitch_classes, name_pitch_classes
+from scale_catalogue import load_catalogue, get_catalogue, set_catalogue
+from query_cache import clear_caches, get_cache_info, set_cache_size, QUERY_CACHE_SIZE
+from mode_analysis import get_mode_analysis
+from mode_search import parse_chord, find_scales_with_input
+from mode_comparator import get_modes_comparison
+
+# Reference search: builds the notes of every scale for every tonic and compares note names
+def find_scales_per_tonic(input_items, notation, is_chord):
+    scales = get_all_scales()
+    notes_en = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+    notes_fr = ['Do', 'Do#', 'Ré', 'Ré#', 'Mi', 'Fa', 'Fa#', 'Sol', 'Sol#', 'La', 'La#', 'Si']
+    notes = notes_en if notation == 'en' else notes_fr
+    matching_scales = []
+    input_items = [item.capitalize() for item in input_items]
+    for tonic in notes:
+        for scale_name, intervals in scales.items():
+            scale_notes = get_scale_notes(intervals, tonic, notation)
+            if is_chord:
+                if all(all(note in scale_notes or get_enharmonic_equivalent(note, notation) in scale_notes for note in parse_chord(chord, notation)) for chord in input_items):
+                    matching_scales.append((tonic, scale_name))
+            else:
+                if all(note in scale_notes or get_enharmonic_equivalent(note, notation) in scale_notes for note in input_items):
+                    matching_scales.append((tonic, scale_name))
+    return matching_scales
+
+# Reference chords: generates the triads and tetrads of a mode from its note names
+def generate_chords(mode_notes):
+    triads = []
+    tetrads = []
+    for i in range(len(mode_notes)):
+        root = mode_notes[i]
+        third = mode_notes[(i + 2) % len(mode_notes)]
+        fifth = mode_notes[(i + 4) % len(mode_notes)]
+        seventh = mode_notes[(i + 6) % len(mode_notes)]
+        triads.append([root, third, fifth])
+        tetrads.append([root, third, fifth, seventh])
+    return triads, tetrads
+
+# Reference analysis: generates and identifies the chords of a mode from its note names
+def analyze_mode_per_tonic(tonic, mode, notation):
+    mode_notes = get_scale_notes(get_all_scales()[mode], tonic, notation)
+    triads, tetrads = generate_chords(mode_notes)
+    return (tuple(mode_notes),
+            tuple((tuple(chord), *identify_chord(chord, notation)) for chord in triads),
+            tuple((tuple(chord), *identify_chord(chord, notation)) for chord in tetrads))
+
+# Reference catalogue search: tests the 12 transpositions of the input against every scale
+def find_scales_per_scale(catalogue, input_mask):
+    input_masks = [rotate_mask(input_mask, -tonic) for tonic in range(12)]
+    matching_by_tonic = [[] for _ in range(12)]
+    for scale_name, scale_mask in catalogue.masks.items():
+        for tonic, mask in enumerate(input_masks):
+            if not mask & ~scale_mask:
+                matching_by_tonic[tonic].append(scale_name)
+    return [(tonic, name) for tonic in range(12) for name in matching_by_tonic[tonic]]
+
+# Function to write a large catalogue: every pitch-class set containing the tonic (2048 scales),
+# each one under several names as happens when merging catalogues, half in JSON and half in CSV
+def write_large_catalogue(directory, names_per_scale=5):
+    definitions = []
+    for name_index in range(names_per_scale):
+        for mask in range(1, 1 << 12, 2):
+            definitions.append((f"ensemble {mask} ({name_index})", mask_to_pitch_classes(mask)))
+    half = len(definitions) // 2
+    with open(os.path.join(directory, 'ensembles_a.json'), 'w', encoding='utf-8') as file:
+        json.dump([{'name': name, 'intervals': intervals} for name, intervals in definitions[:half]], file)
+    with open(os.path.join(directory, 'ensembles_b.csv'), 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['name', 'intervals'])
+        writer.writerows((name, ' '.join(map(str, intervals))) for name, intervals in definitions[half:])
+    return len(definitions)
+
+# Search queries used by the benchmark: (input items, notation, is_chord)
+SEARCH_QUERIES = [
+    (['Do', 'Mi', 'Sol#'], 'fr', False),
+    (['Réb', 'fa'], 'fr', False),
+    (['C', 'Eb'], 'en', False),
+    (['Am', 'Dm7'], 'en', True),
+    (['Rém', 'Sol7'], 'fr', True),
+]
+
+# Function to time a callable and return the mean duration of one call in microseconds
+def time_call(function, number):
+    return timeit.timeit(function, number=number) / number * 1e6
+
+# Function to check that both implementations agree, then print their timings
+def main(number=200):
+    notes_en = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+    scales = get_all_scales()
+
+    for query in SEARCH_QUERIES:
+        assert find_scales_with_input(*query) == find_scales_per_tonic(*query), query
+    for tonic in notes_en:
+        for mode in scales:
+            assert get_mode_analysis(tonic, mode, 'en') == analyze_mode_per_tonic(tonic, mode, 'en'), (tonic, mode)
+
+    # The query cache is emptied before each run so that every query is computed
+    def run_search(search):
+        clear_caches()
+        for query in SEARCH_QUERIES:
+            search(*query)
+
+    def run_analysis(analysis):
+        clear_caches()
+        for tonic in notes_en:
+            for mode in scales:
+                analysis(tonic, mode, 'en')
+
+    print(f"{'Benchmark':<48}{'par tonique (µs)':>18}{'invariant (µs)':>18}{'gain':>8}")
+    search_label = f"Recherche ({len(SEARCH_QUERIES)} requêtes)"
+    reference_time = time_call(lambda: run_search(find_scales_per_tonic), number)
+    invariant_time = time_call(lambda: run_search(find_scales_with_input), number)
+    print(f"{search_label:<48}{reference_time:>18.1f}{invariant_time:>18.1f}{reference_time / invariant_time:>7.1f}x")
+
+    # Analysis with the query cache disabled: the invariant part is recomputed for every tonic.
+    # With the cache, it is computed once per mode (at the first tonic) and only named for the others
+    analysis_label = f"Analyse (12 toniques x {len(scales)} modes)"
+    count = max(1, number // 10)
+    reference_time = time_call(lambda: run_analysis(analyze_mode_per_tonic), count)
+    set_cache_size(0)
+    uncached_time = time_call(lambda: run_analysis(get_mode_analysis), count)
+    set_cache_size(QUERY_CACHE_SIZE)
+    invariant_time = time_call(lambda: run_analysis(get_mode_analysis), count)
+    print(f"{analysis_label + ', sans cache':<48}{reference_time:>18.1f}{uncached_time:>18.1f}{reference_time / uncached_time:>7.1f}x")
+    print(f"{analysis_label + ', 1 calcul/mode':<48}{reference_time:>18.1f}{invariant_time:>18.1f}{reference_time / invariant_time:>7.1f}x")
+
+    # Large catalogue loaded from data files
+    with tempfile.TemporaryDirectory() as directory:
+        definition_count = write_large_catalogue(directory)
+        load_time = time_call(lambda: load_catalogue([directory]), 1)
+        catalogue = load_catalogue([directory])
+
+    input_masks = [intervals_to_mask(intervals) for intervals in ([0], [0, 4], [0, 4, 7], [0, 3, 7, 10], [0, 2, 4, 5, 7])]
+    for input_mask in input_masks:
+        assert catalogue.find_scales_containing(input_mask) == find_scales_per_scale(catalogue, input_mask), input_mask
+
+    # 2048 is the number of distinct scales possible with 12 notes, the other definitions are aliases
+    print(f"\nCatalogue : {definition_count} définitions, dont {len(catalogue.aliases)} alias, soit {len(catalogue)} gammes distinctes "
+          f"en {len(catalogue.family_masks)} familles, chargé en {load_time / 1000:.0f} ms")
+    print(f"{'Recherche dans le catalogue':<48}{'par gamme (ms)':>18}{'par famille (ms)':>18}{'gain':>8}{'find_scales_with_input (ms)':>30}")
+    default_catalogue = get_catalogue()
+    set_catalogue(catalogue)
+    for input_mask in input_masks:
+        label = f"{len(mask_to_pitch_classes(input_mask))} note(s), {len(catalogue.find_scales_containing(input_mask))} résultats"
+        reference_time = time_call(lambda: find_scales_per_scale(catalogue, input_mask), max(1, number // 20)) / 1000
+        family_time = time_call(lambda: catalogue.find_scales_containing(input_mask), max(1, number // 20)) / 1000
+
+        # Public entry point used by the GUI, from note names and without the query cache
+        input_notes = name_pitch_classes(mask_to_pitch_classes(input_mask), 'fr')
+        def search_notes():
+            clear_caches()
+            return find_scales_with_input(input_notes, 'fr', False)
+        public_time = time_call(search_notes, max(1, number // 20)) / 1000
+        print(f"{label:<48}{reference_time:>18.2f}{family_time:>18.2f}{reference_time / family_time:>7.1f}x{public_time:>30.2f}")
+    set_catalogue(default_catalogue)
+    clear_caches()
+
+    # Repeated queries, written differently but sharing the same normalized inputs
+    repeated_queries = [
+        (find_scales_with_input, (['Do#', 'fa'], 'fr', False)),
+        (find_scales_with_input, (['Réb', 'Fa'], 'fr', False)),
+        (find_scales_with_input, (['C#', 'F'], 'en', False)),
+        (get_mode_analysis, ('Do#', 'dorien', 'fr')),
+        (get_mode_analysis, ('Db', 'dorien', 'en')),
+        (get_modes_comparison, ('ionien', 'Do', 'dorien', 'Ré', 'fr')),
+        (get_modes_comparison, ('ionien', 'c', 'dorien', 'd', 'en')),
+    ]
+
+    def run_cold():
+        for query, arguments in repeated_queries:
+            clear_caches()
+            query(*arguments)
+
+    def run_repeated():
+        for query, arguments in repeated_queries:
+            query(*arguments)
+
+    clear_caches()
+    run_repeated()
+    cold_time = time_call(run_cold, number)
+    cached_time = time_call(run_repeated, number)
+    print(f"\n{'Requêtes répétées':<48}{'sans cache (µs)':>18}{'avec cache (µs)':>18}{'gain':>8}")
+    print(f"{f'{len(repeated_queries)} requêtes':<48}{cold_time:>18.1f}{cached_time:>18.1f}{cold_time / cached_time:>7.1f}x")
+    clear_caches()
+    run_repeated()
+    for name, info in get_cache_info().items():
+        print(f"  {name}: {info.hits} succès, {info.misses} échecs, {info.currsize}/{info.maxsize} entrées")
+
+# Run the benchmark if this script is executed directly
+if __name__ == "__main__":
+    main()
@@ -2,32 +2,51 @@
 notes, formatting note names, and finding enharmonic equivalents"""
 # common.py
 
-# This function returns a dictionary of all scales with their corresponding intervals
+# This function returns a dictionary of all scales with their corresponding intervals.
+# Scales are loaded once from the data files of the scale catalogue; the dictionary is shared, do not modify it
 def get_all_scales():
+    # Imported here because the catalogue itself relies on the pitch-class helpers of this module
+    from scale_catalogue import get_catalogue
     # Each scale is represented by a list of semitone intervals from the root note
-    return {
-        'ionien': [0, 2, 4, 5, 7, 9, 11],
-        'dorien': [0, 2, 3, 5, 7, 9, 10],
-        'phrygien': [0, 1, 3, 5, 7, 8, 10],
-        'lydien': [0, 2, 4, 6, 7, 9, 11],
-        'mixolydien': [0, 2, 4, 5, 7, 9, 10],
-        'éolien': [0, 2, 3, 5, 7, 8, 10],
-        'locrien': [0, 1, 3, 5, 6, 8, 10],
-        'mineur mélodique': [0, 2, 3, 5, 7, 9, 11],
-        'dorien b2': [0, 1, 3, 5, 7, 9, 10],
-        'lydien augmenté': [0, 2, 4, 6, 8, 9, 11],
-        'lydien dominant': [0, 2, 4, 6, 7, 9, 10],
-        'mixolydien b6': [0, 2, 4, 5, 7, 8, 10],
-        'éolien b5': [0, 2, 3, 5, 6, 8, 10],
-        'super locrien': [0, 1, 3, 4, 6, 8, 10],
-        'mineur harmonique': [0, 2, 3, 5, 7, 8, 11],
-        'locrien #6': [0, 1, 3, 5, 6, 9, 10],
-        'ionien #5': [0, 2, 4, 5, 8, 9, 11],
-        'dorien #4': [0, 2, 3, 6, 7, 9, 10],
-        'phrygien dominant': [0, 1, 4, 5, 7, 8, 10],
-        'lydien #2': [0, 3, 4, 6, 7, 9, 11],
-        'super locrien bb7': [0, 1, 3, 4, 6, 8, 9]
-    }
+    return get_catalogue().scales
+
+# Note names indexed by pitch class (0 = C) in English and French notations
+NOTES_EN = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+NOTES_FR = ['Do', 'Do#', 'Ré', 'Ré#', 'Mi', 'Fa', 'Fa#', 'Sol', 'Sol#', 'La', 'La#', 'Si']
+
+# This function converts a list of intervals into a 12-bit pitch-class mask (bit 0 is the tonic)
+def intervals_to_mask(intervals):
+    mask = 0
+    for interval in intervals:
+        mask |= 1 << (interval % 12)
+    return mask
+
+# This function transposes a pitch-class mask by the given number of semitones (bit rotation)
+def rotate_mask(mask, steps):
+    steps %= 12
+    return ((mask << steps) | (mask >> (12 - steps))) & 0xFFF
+
+# This function returns the pitch classes contained in a mask, in ascending order
+def mask_to_pitch_classes(mask):
+    return [pitch_class for pitch_class in range(12) if mask >> pitch_class & 1]
+
+# This function returns the pitch class of a note (enharmonic spellings included), or None if unknown
+def note_to_pitch_class(note, notation):
+    notes = NOTES_EN if notation == 'en' else NOTES_FR
+    note = note.capitalize()
+    if note not in notes:
+        note = get_enharmonic_equivalent(note, notation)
+    return notes.index(note) if note in notes else None
+
+# This function converts a list of notes into a pitch-class mask, or None if a note is unknown
+def notes_to_mask(notes, notation):
+    mask = 0
+    for note in notes:
+        pitch_class = note_to_pitch_class(note, notation)
+        if pitch_class is None:
+            return None
+        mask |= 1 << pitch_class
+    return mask
 
 # This function generates the notes of a scale based on the given intervals, tonic, and notation
 def get_scale_notes(intervals, tonic, notation='en'):
@@ -50,92 +69,97 @@ def get_scale_notes(intervals, tonic, notation='en'):
     
     return scale_notes
 
+# Chord qualities indexed by the intervals of the third, fifth (and seventh) above the root.
+# Each entry gives the chord type and the suffix used for its usual name
+CHORD_QUALITIES = {
+    (4, 7): ("majeur", ""),
+    (3, 7): ("mineur", "m"),
+    (3, 6): ("diminué", "dim"),
+    (4, 8): ("augmenté", "aug"),
+    (4, 7, 11): ("majeur 7", "maj7"),
+    (4, 7, 10): ("dominant 7", "7"),
+    (3, 7, 10): ("mineur 7", "m7"),
+    (3, 7, 11): ("mineur majeur 7", "mMaj7"),
+    (3, 6, 9): ("diminué 7", "dim7"),
+    (3, 6, 10): ("demi-diminué 7", "m7b5"),
+    (4, 8, 11): ("majeur 7 quinte augmenté", "maj7(#5)"),
+}
+
 # This function identifies the chord type and usual name based on the given notes
 def identify_chord(chord, notation):
     # Define note names and create dictionaries for translation between French and English
     notes_en = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
     notes_fr = ['Do', 'Do#', 'Ré', 'Ré#', 'Mi', 'Fa', 'Fa#', 'Sol', 'Sol#', 'La', 'La#', 'Si']
     notes_fr_to_en = dict(zip(notes_fr, notes_en))
-    notes_en_to_fr = dict(zip(notes_en, notes_fr))
     
     # Capitalize all notes in the chord
     chord = [note.capitalize() for note in chord]
     
     # Convert French notation to English if necessary
     if notation == 'fr':
-        notes = notes_fr
         chord_en = [notes_fr_to_en[note] if note in notes_fr_to_en else note for note in chord]
     else:
-        notes = notes_en
         chord_en = chord
     
-    # Extract root, third, and fifth from the chord
-    root, third, fifth = chord_en[:3]
-    
-    # Calculate intervals between root and other notes
+    # Calculate intervals between the root and the other notes (third, fifth and seventh)
+    root = chord_en[0]
     root_index = notes_en.index(root)
-    third_interval = (notes_en.index(third) - root_index) % 12
-    fifth_interval = (notes_en.index(fifth) - root_index) % 12
-    
-    # Initialize chord type and usual name
-    chord_type = ""
-    usual_name = ""
-
-    # Identify chord type for triads
-    if len(chord_en) == 3:  # Triade
-        if third_interval == 4 and fifth_interval == 7:
-            chord_type = "majeur"
-            usual_name = chord[0] if notation == 'fr' else root
-        elif third_interval == 3 and fifth_interval == 7:
-            chord_type = "mineur"
-            usual_name = f"{chord[0]}m" if notation == 'fr' else f"{root}m"
-        elif third_interval == 3 and fifth_interval == 6:
-            chord_type = "diminué"
-            usual_name = f"{chord[0]}dim" if notation == 'fr' else f"{root}dim"
-        elif third_interval == 4 and fifth_interval == 8:
-            chord_type = "augmenté"
-            usual_name = f"{chord[0]}aug" if notation == 'fr' else f"{root}aug"
-    elif len(chord_en) == 4:  # Tétrade
-        seventh = chord_en[3]
-        seventh_interval = (notes_en.index(seventh) - root_index) % 12
-        
-    # Identify chord type for tetrads
-    elif len(chord_en) == 4:
-        seventh = chord_en[3]
-        seventh_interval = (notes_en.index(seventh) - root_index) % 12
-
-        if third_interval == 4 and fifth_interval == 7:
-            if seventh_interval == 11:
-                chord_type = "majeur 7"
-                usual_name = f"{chord[0]}maj7" if notation == 'fr' else f"{root}maj7"
-            elif seventh_interval == 10:
-                chord_type = "dominant 7"
-                usual_name = f"{chord[0]}7" if notation == 'fr' else f"{root}7"
-        elif third_interval == 3 and fifth_interval == 7:
-            if seventh_interval == 10:
-                chord_type = "mineur 7"
-                usual_name = f"{chord[0]}m7" if notation == 'fr' else f"{root}m7"
-            elif seventh_interval == 11:
-                chord_type = "mineur majeur 7"
-                usual_name = f"{chord[0]}mMaj7" if notation == 'fr' else f"{root}mMaj7"
-        elif third_interval == 3 and fifth_interval == 6:
-            if seventh_interval == 9:
-                chord_type = "diminué 7"
-                usual_name = f"{chord[0]}dim7" if notation == 'fr' else f"{root}dim7"
-            elif seventh_interval == 10:
-                chord_type = "demi-diminué 7"
-                usual_name = f"{chord[0]}m7b5" if notation == 'fr' else f"{root}m7b5"
-        elif third_interval == 4 and fifth_interval == 8 and seventh_interval == 11:
-            chord_type = "majeur 7 quinte augmenté"
-            usual_name = f"{chord[0]}maj7(#5)" if notation == 'fr' else f"{root}maj7(#5)"
-
-    # If chord type is not identified, mark as non-standard
-    if not chord_type:
-        chord_type = "non standard"
-        usual_name = "N/A"
-    
+    intervals = tuple((notes_en.index(note) - root_index) % 12 for note in chord_en[1:])
+
+    # Look up the chord quality; triads and tetrads are told apart by the number of intervals
+    if len(chord_en) not in (3, 4) or intervals not in CHORD_QUALITIES:
+        return "non standard", "N/A"
+
+    chord_type, suffix = CHORD_QUALITIES[intervals]
+    usual_name = f"{chord[0]}{suffix}" if notation == 'fr' else f"{root}{suffix}"
     return chord_type, usual_name
 
+# This function returns, for each degree of a scale, the triad and tetrad built on it in
+# transposition-invariant form: (root interval from the tonic, chord intervals from the root,
+# chord type, usual name suffix). The result only depends on the intervals, so it can be computed
+# once per scale and reused for every tonic
+def get_scale_chords(intervals):
+    intervals = tuple(intervals)
+    size = len(intervals)
+    triads = []
+    tetrads = []
+    for i in range(size):
+        root = intervals[i]
+        chord_intervals = tuple((intervals[(i + step) % size] - root) % 12 for step in (0, 2, 4, 6))
+        for chord, chords in ((chord_intervals[:3], triads), (chord_intervals, tetrads)):
+            chord_type, suffix = CHORD_QUALITIES.get(chord[1:], ("non standard", None))
+            chords.append((root, chord, chord_type, suffix))
+    return tuple(triads), tuple(tetrads)
+
+# This function returns the note names of a list of pitch classes
+def name_pitch_classes(pitch_classes, notation='en'):
+    notes = NOTES_EN if notation == 'en' else NOTES_FR
+    return [notes[pitch_class] for pitch_class in pitch_classes]
+
+# This function returns a chord named from the pitch class of its root and its intervals from the root,
+# as (notes, chord type, usual name)
+def name_chord(root_index, chord, chord_type, suffix, notation='en'):
+    notes = NOTES_EN if notation == 'en' else NOTES_FR
+    chord_notes = tuple(notes[(root_index + interval) % 12] for interval in chord)
+    usual_name = "N/A" if suffix is None else f"{chord_notes[0]}{suffix}"
+    return chord_notes, chord_type, usual_name
+
+# Chords of every standard quality named on every root, by notation:
+# (root pitch class, chord intervals from the root) -> (notes, chord type, usual name)
+NAMED_CHORDS = {
+    notation: {(root_index, (0,) + intervals): name_chord(root_index, (0,) + intervals, chord_type, suffix, notation)
+               for intervals, (chord_type, suffix) in CHORD_QUALITIES.items() for root_index in range(12)}
+    for notation in ('en', 'fr')
+}
+
+# This function names the chords returned by get_scale_chords for the given tonic pitch class.
+# Standard chords are read from NAMED_CHORDS. Each chord is returned as (notes, chord type, usual name)
+def name_scale_chords(scale_chords, tonic_index, notation='en'):
+    named_chords = NAMED_CHORDS['en' if notation == 'en' else 'fr']
+    return tuple(named_chords.get(((tonic_index + root) % 12, chord))
+                 or name_chord((tonic_index + root) % 12, chord, chord_type, suffix, notation)
+                 for root, chord, chord_type, suffix in scale_chords)
+
 # This function prints the chords with their names and usual names
 def print_chords(chords, chord_type, notation):
     for i, chord in enumerate(chords, 1):
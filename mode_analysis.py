@@ -2,37 +2,46 @@
 # Import necessary libraries and modules
 import tkinter as tk
 from tkinter import ttk
-from common import get_all_scales, get_scale_notes, identify_chord, format_notes, get_enharmonic_equivalent
-
-# Function to generate triads and tetrads from a given set of mode notes
-def generate_chords(mode_notes):
-    triads = []
-    tetrads = []
-    for i in range(len(mode_notes)):
-        root = mode_notes[i]
-        third = mode_notes[(i + 2) % len(mode_notes)]
-        fifth = mode_notes[(i + 4) % len(mode_notes)]
-        seventh = mode_notes[(i + 6) % len(mode_notes)]
-        triads.append([root, third, fifth])
-        tetrads.append([root, third, fifth, seventh])
-    return triads, tetrads
+from common import get_all_scales, format_notes, get_enharmonic_equivalent, get_scale_chords, name_scale_chords, name_pitch_classes, note_to_pitch_class, mask_to_pitch_classes
+from scale_catalogue import get_catalogue
+from query_cache import cached_query
+
+# Cached function to compute the transposition-invariant part of the analysis of a mode from its
+# pitch-class mask at C: its intervals and the qualities of its triads and tetrads (see get_scale_chords).
+# It does not depend on the tonic nor on the notation, so it is computed once per mode
+@cached_query
+def analyze_mode_mask(mode_mask):
+    intervals = tuple(mask_to_pitch_classes(mode_mask))
+    triads, tetrads = get_scale_chords(intervals)
+    return intervals, triads, tetrads
+
+# Function to compute the notes, triads and tetrads of a mode without any GUI.
+# Only the requested tonic is named, standard chords being read from the table of named chords.
+# Returns None if the mode is unknown
+def get_mode_analysis(tonic, mode, notation):
+    mode_mask = get_catalogue().get_mask(mode)
+    if mode_mask is None:
+        return None
+
+    tonic_index = note_to_pitch_class(tonic, notation)
+    if tonic_index is None:
+        raise ValueError(f"Tonique '{tonic}' non reconnue")
+
+    intervals, triads, tetrads = analyze_mode_mask(mode_mask)
+    mode_notes = tuple(name_pitch_classes([(tonic_index + interval) % 12 for interval in intervals], notation))
+    return mode_notes, name_scale_chords(triads, tonic_index, notation), name_scale_chords(tetrads, tonic_index, notation)
 
 # Main function to analyze the selected mode and display results
 def analyze_mode(tonic, mode, notation, output_text):
-    scales = get_all_scales()
-    if mode.lower() not in scales:
+    analysis = get_mode_analysis(tonic, mode, notation)
+    if analysis is None:
         output_text.insert("1.0", f"Mode '{mode}' non reconnu.\n\n")
         return
 
-    # Get mode notes and format them
-    mode_notes = get_scale_notes(scales[mode.lower()], tonic, notation)
+    # Format mode notes
+    mode_notes, triads, tetrads = analysis
     mode_notes_formatted = format_notes(mode_notes, notation)
 
-    # Generate and format chords
-    triads, tetrads = generate_chords(mode_notes)
-    triads_formatted = [format_notes(chord, notation) for chord in triads]
-    tetrads_formatted = [format_notes(chord, notation) for chord in tetrads]
-
     # Create main frame for displaying results
     main_frame = tk.Frame(output_text, bd=2, relief=tk.SOLID)
     
@@ -53,8 +62,8 @@ def analyze_mode(tonic, mode, notation, output_text):
     triads_label = tk.Label(triads_frame, text="", anchor="w", justify=tk.LEFT)
     triads_label.pack(side=tk.LEFT, padx=(5, 0))
     triads_text = ""
-    for i, chord in enumerate(triads_formatted, 1):
-        chord_type, usual_name = identify_chord(chord, notation)
+    for i, (chord, chord_type, usual_name) in enumerate(triads, 1):
+        chord = format_notes(chord, notation)
         triads_text += f"Triade {i}: {' - '.join(chord)} ({chord[0]} {chord_type}, nom usuel: {usual_name})\n"
     triads_label.config(text=triads_text)
 
@@ -65,8 +74,8 @@ def analyze_mode(tonic, mode, notation, output_text):
     tetrads_label = tk.Label(tetrads_frame, text="", anchor="w", justify=tk.LEFT)
     tetrads_label.pack(side=tk.LEFT, padx=(5, 0))
     tetrads_text = ""
-    for i, chord in enumerate(tetrads_formatted, 1):
-        chord_type, usual_name = identify_chord(chord, notation)
+    for i, (chord, chord_type, usual_name) in enumerate(tetrads, 1):
+        chord = format_notes(chord, notation)
         tetrads_text += f"Tétrade {i}: {' - '.join(chord)} ({chord[0]} {chord_type}, nom usuel: {usual_name})\n"
     tetrads_label.config(text=tetrads_text)
 
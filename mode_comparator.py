@@ -2,19 +2,53 @@
 # Import necessary libraries and modules
 import tkinter as tk
 from tkinter import ttk
-from common import get_all_scales, get_scale_notes, get_enharmonic_equivalent, format_notes
+from common import get_all_scales, get_enharmonic_equivalent, format_notes, note_to_pitch_class, rotate_mask, mask_to_pitch_classes, name_pitch_classes
+from scale_catalogue import get_catalogue
+from query_cache import cached_query
+
+# Cached function to compare two modes given by their pitch-class mask at C and the pitch class of
+# their tonic. Returns the pitch classes of both modes, their common and their different pitch classes
+@cached_query
+def compare_pitch_classes(mode_mask1, tonic_index1, mode_mask2, tonic_index2):
+    pitch_classes1 = tuple((tonic_index1 + interval) % 12 for interval in mask_to_pitch_classes(mode_mask1))
+    pitch_classes2 = tuple((tonic_index2 + interval) % 12 for interval in mask_to_pitch_classes(mode_mask2))
+    mask1 = rotate_mask(mode_mask1, tonic_index1)
+    mask2 = rotate_mask(mode_mask2, tonic_index2)
+
+    # Keep common and different notes in the order of their mode
+    common = tuple(pitch_class for pitch_class in pitch_classes1 if mask2 >> pitch_class & 1)
+    diff1 = tuple(pitch_class for pitch_class in pitch_classes1 if not mask2 >> pitch_class & 1)
+    diff2 = tuple(pitch_class for pitch_class in pitch_classes2 if not mask1 >> pitch_class & 1)
+    return pitch_classes1, pitch_classes2, common, diff1, diff2
+
+# Function to compute the notes of two modes along with their common and different notes, without any GUI.
+# Returns None if a mode is unknown
+def get_modes_comparison(mode1, tonic1, mode2, tonic2, notation):
+    catalogue = get_catalogue()
+    mode_mask1 = catalogue.get_mask(mode1)
+    mode_mask2 = catalogue.get_mask(mode2)
+    # Check if both modes are valid
+    if mode_mask1 is None or mode_mask2 is None:
+        return None
+
+    tonic_index1 = note_to_pitch_class(tonic1, notation)
+    tonic_index2 = note_to_pitch_class(tonic2, notation)
+    if tonic_index1 is None or tonic_index2 is None:
+        raise ValueError(f"Tonique '{tonic1 if tonic_index1 is None else tonic2}' non reconnue")
+
+    # Name the cached pitch classes in the requested notation
+    comparison = compare_pitch_classes(mode_mask1, tonic_index1, mode_mask2, tonic_index2)
+    return tuple(name_pitch_classes(pitch_classes, notation) for pitch_classes in comparison)
 
 # Function to compare two musical modes
 def compare_modes(mode1, tonic1, mode2, tonic2, notation, output_text):
-    scales = get_all_scales()
-    # Check if both modes are valid
-    if mode1.lower() not in scales or mode2.lower() not in scales:
+    comparison = get_modes_comparison(mode1, tonic1, mode2, tonic2, notation)
+    if comparison is None:
         output_text.insert("1.0", "Un ou plusieurs modes non reconnus.\n\n")
         return
 
-    # Get and format notes for both modes
-    notes1 = get_scale_notes(scales[mode1.lower()], tonic1, notation)
-    notes2 = get_scale_notes(scales[mode2.lower()], tonic2, notation)
+    # Format notes for both modes
+    notes1, notes2, common_notes, diff_notes1, diff_notes2 = comparison
     notes1_formatted = format_notes(notes1, notation)
     notes2_formatted = format_notes(notes2, notation)
 
@@ -37,7 +71,6 @@ def compare_modes(mode1, tonic1, mode2, tonic2, notation, output_text):
     tk.Label(notes_frame2, text=" - ".join(notes2_formatted), anchor="w").pack(side=tk.LEFT, padx=(5, 0))
 
     # Display common notes
-    common_notes = list(set(notes1) & set(notes2))
     common_notes_formatted = format_notes(common_notes, notation)
     common_frame = tk.Frame(main_frame)
     common_frame.pack(fill=tk.X, padx=5, pady=2)
@@ -45,8 +78,6 @@ def compare_modes(mode1, tonic1, mode2, tonic2, notation, output_text):
     tk.Label(common_frame, text=" - ".join(common_notes_formatted), anchor="w").pack(side=tk.LEFT, padx=(5, 0))
 
     # Display different notes
-    diff_notes1 = list(set(notes1) - set(notes2))
-    diff_notes2 = list(set(notes2) - set(notes1))
     diff_notes1_formatted = format_notes(diff_notes1, notation)
     diff_notes2_formatted = format_notes(diff_notes2, notation)
     diff_frame = tk.Frame(main_frame)
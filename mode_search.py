@@ -3,7 +3,9 @@
 # Import necessary libraries and modules
 import tkinter as tk
 from tkinter import ttk
-from common import get_all_scales, get_scale_notes, format_notes, get_enharmonic_equivalent
+from common import notes_to_mask, name_pitch_classes
+from scale_catalogue import get_catalogue
+from query_cache import cached_query
 
 # Function to parse chord input and return a list of notes
 def parse_chord(chord_str, notation):
@@ -44,29 +46,28 @@ def parse_chord(chord_str, notation):
     # If not, split the chord string by '-'
     return [note.strip().capitalize() for note in chord_str.split('-')]
 
+# Cached function to find the (tonic pitch class, scale name) pairs of the catalogue whose notes
+# contain the given pitch-class mask. The cache is cleared whenever the catalogue changes
+@cached_query
+def find_scales_containing_mask(input_mask):
+    return tuple(get_catalogue().find_scales_containing(input_mask))
+
 # Function to find scales containing the input notes or chords
 def find_scales_with_input(input_items, notation, is_chord):
-    scales = get_all_scales()
-    notes_en = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-    notes_fr = ['Do', 'Do#', 'Ré', 'Ré#', 'Mi', 'Fa', 'Fa#', 'Sol', 'Sol#', 'La', 'La#', 'Si']
-    notes = notes_en if notation == 'en' else notes_fr
-    matching_scales = []
-
     # Convert inputs to appropriate format
     input_items = [item.capitalize() for item in input_items]
-
-    # Check each scale for containing the input notes or chords
-    for tonic in notes:
-        for scale_name, intervals in scales.items():
-            scale_notes = get_scale_notes(intervals, tonic, notation)
-            if is_chord:
-                if all(all(note in scale_notes or get_enharmonic_equivalent(note, notation) in scale_notes for note in parse_chord(chord, notation)) for chord in input_items):
-                    matching_scales.append((tonic, scale_name))
-            else:
-                if all(note in scale_notes or get_enharmonic_equivalent(note, notation) in scale_notes for note in input_items):
-                    matching_scales.append((tonic, scale_name))
-
-    return matching_scales
+    if is_chord:
+        input_items = [note for chord in input_items for note in parse_chord(chord, notation)]
+
+    # Reduce the input to a pitch-class mask; an unknown note cannot be contained in any scale
+    input_mask = notes_to_mask(input_items, notation)
+    if input_mask is None:
+        return []
+
+    # The catalogue tests the 12 transpositions of the input against each family of modes
+    matching_scales = find_scales_containing_mask(input_mask)
+    tonics = name_pitch_classes([tonic for tonic, _ in matching_scales], notation)
+    return [(tonic, scale_name) for tonic, (_, scale_name) in zip(tonics, matching_scales)]
 
 # Function to format input string based on notation
 def format_input(input_string, notation):
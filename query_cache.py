@@ -0,0 +1,76 @@
+"""This code provides a bounded memoization layer for the analysis, search and comparison queries. Queries are cached on normalized inputs (pitch classes and pitch-class masks rather than note names), so equivalent inputs written differently share the same entry, and the least recently used results are evicted."""
+# query_cache.py
+from collections import OrderedDict, namedtuple
+from functools import update_wrapper
+
+# Default maximum number of results kept by each cached query, see set_cache_size
+QUERY_CACHE_SIZE = 256
+
+# Statistics of a cached query, as returned by get_cache_info
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# Cached queries, by module and function name
+_cached_queries = {}
+
+class CachedQuery:
+    """Query whose results are kept in a bounded LRU cache keyed on its arguments."""
+
+    def __init__(self, function, maxsize):
+        update_wrapper(self, function)
+        self.function = function
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, *args):
+        if args in self.results:
+            self.hits += 1
+            self.results.move_to_end(args)
+            return self.results[args]
+
+        self.misses += 1
+        result = self.function(*args)
+        self.results[args] = result
+        self.evict()
+        return result
+
+    # This method removes the least recently used results beyond the size limit
+    def evict(self):
+        while len(self.results) > self.maxsize:
+            self.results.popitem(last=False)
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.results))
+
+    def cache_clear(self):
+        self.results.clear()
+        self.hits = 0
+        self.misses = 0
+
+# This decorator caches a query with a bounded LRU cache and registers it for statistics.
+# The arguments of the query must be hashable and its result must not be modified by callers
+def cached_query(function):
+    query = CachedQuery(function, QUERY_CACHE_SIZE)
+    _cached_queries[f"{function.__module__}.{function.__name__}"] = query
+    return query
+
+# This function returns the hits, misses, maximum size and current size of each cached query
+def get_cache_info():
+    return {name: query.cache_info() for name, query in _cached_queries.items()}
+
+# This function empties the caches of all the queries
+def clear_caches():
+    for query in _cached_queries.values():
+        query.cache_clear()
+
+# This function changes the maximum number of results kept by each cached query, including the
+# queries already registered, and evicts the results beyond the new limit. A size of 0 disables caching
+def set_cache_size(maxsize):
+    global QUERY_CACHE_SIZE
+    if isinstance(maxsize, bool) or not isinstance(maxsize, int) or maxsize < 0:
+        raise ValueError(f"Taille de cache invalide : {maxsize!r}")
+    QUERY_CACHE_SIZE = maxsize
+    for query in _cached_queries.values():
+        query.maxsize = maxsize
+        query.evict()
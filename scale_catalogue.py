@@ -0,0 +1,195 @@
+"""This code loads scale definitions from JSON and CSV data files into a catalogue. Scales are deduplicated by pitch-class mask, grouped into families of rotations (modes of the same scale), and the indexes used to look up, search and compare scales are built once at load."""
+# scale_catalogue.py
+import csv
+import json
+import os
+import sys
+import warnings
+from common import intervals_to_mask, rotate_mask, mask_to_pitch_classes
+from query_cache import clear_caches
+
+# Directory holding the default scale data files (also inside a PyInstaller bundle)
+SCALES_DIR = os.path.join(getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__))), 'scales')
+
+# Extensions of the scale data files that can be loaded
+SCALE_FILE_EXTENSIONS = ('.json', '.csv')
+
+# This function reads scale definitions from a JSON file, either as an object mapping each name
+# to its intervals or as a list of {"name": ..., "intervals": [...]} objects
+def read_json_scales(path):
+    with open(path, encoding='utf-8') as file:
+        data = json.load(file)
+    if isinstance(data, dict):
+        return list(data.items())
+    # Malformed entries are kept so that they are reported when added to the catalogue
+    return [(entry.get('name'), entry.get('intervals')) if isinstance(entry, dict) else (None, entry) for entry in data]
+
+# This function reads scale definitions from a CSV file with a "name" column and an "intervals"
+# column holding the intervals separated by spaces
+def read_csv_scales(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        return [(row.get('name'), (row.get('intervals') or '').split()) for row in csv.DictReader(file)]
+
+# This function reads the scale definitions of a data file according to its extension
+def read_scales(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.json':
+        return read_json_scales(path)
+    if extension == '.csv':
+        return read_csv_scales(path)
+    raise ValueError(f"Format de fichier de gammes non reconnu : {path}")
+
+# This function returns the data files to load for the given files and directories.
+# The files of a directory are loaded in alphabetical order
+def list_scale_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                         if os.path.splitext(name)[1].lower() in SCALE_FILE_EXTENSIONS)
+        else:
+            files.append(path)
+    return files
+
+# Pitch classes contained in each of the 4096 possible masks, used to expand search results
+PITCH_CLASSES_BY_MASK = [mask_to_pitch_classes(mask) for mask in range(1 << 12)]
+
+# This function converts an interval read from a data file to an integer. Integer-valued strings
+# are accepted (CSV files); booleans and non-integer values such as 2.7 raise ValueError
+def parse_interval(interval):
+    if isinstance(interval, bool):
+        raise ValueError(interval)
+    if isinstance(interval, str):
+        return int(interval)
+    if int(interval) != interval:
+        raise ValueError(interval)
+    return int(interval)
+
+# This function returns the smallest rotation of a pitch-class mask and the number of semitones
+# it is rotated by. All the modes of a scale share the same smallest rotation
+def get_family(mask):
+    return min((rotate_mask(mask, steps), steps) for steps in range(12))
+
+class ScaleCatalogue:
+    """Scales indexed by name, pitch-class mask and family of rotations."""
+
+    def __init__(self, definitions=()):
+        self.scales = {}           # name -> sorted intervals, in catalogue order
+        self.masks = {}            # name -> pitch-class mask at C
+        self.names_by_mask = {}    # pitch-class mask -> name of the first scale defining it
+        self.aliases = {}          # duplicated name -> name of the scale with the same mask
+        self.families = {}         # name -> (family mask, rotation from the scale to its family)
+        self.family_masks = set()  # smallest rotation of every family
+        self.errors = []           # definitions rejected while loading data files
+        for name, intervals in definitions:
+            self.add(name, intervals)
+
+    def __len__(self):
+        return len(self.scales)
+
+    def add(self, name, intervals):
+        # Names are looked up in lowercase, as typed in the GUI
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError(f"Nom de gamme invalide : {name!r}")
+        name = name.strip().lower()
+
+        # Intervals are reduced to one octave, so that an octave written as 12 is accepted
+        try:
+            if isinstance(intervals, str):
+                raise TypeError
+            pitch_classes = sorted({parse_interval(interval) % 12 for interval in intervals})
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"Intervalles invalides pour la gamme '{name}' : {intervals!r}") from None
+        if not pitch_classes or pitch_classes[0] != 0:
+            raise ValueError(f"Intervalles invalides pour la gamme '{name}' : {intervals!r}")
+        mask = intervals_to_mask(pitch_classes)
+
+        # A name can only be defined again with the same notes
+        known_mask = self.get_mask(name)
+        if known_mask is not None:
+            if known_mask != mask:
+                raise ValueError(f"Gamme '{name}' déjà définie avec les intervalles {self.get_intervals(name)}")
+            return
+
+        # A scale with the same notes as a known scale is only recorded as an alias
+        if mask in self.names_by_mask:
+            self.aliases[name] = self.names_by_mask[mask]
+            return
+
+        self.scales[name] = pitch_classes
+        self.masks[name] = mask
+        self.names_by_mask[mask] = name
+        self.families[name] = get_family(mask)
+        self.family_masks.add(self.families[name][0])
+
+        # Cached search results are no longer valid once the catalogue used by the programs changes
+        if self is _catalogue:
+            clear_caches()
+
+    # This method returns the intervals of a scale from its name or alias, or None if unknown
+    def get_intervals(self, name):
+        name = name.strip().lower()
+        return self.scales.get(self.aliases.get(name, name))
+
+    # This method returns the pitch-class mask of a scale at C from its name or alias, or None if unknown
+    def get_mask(self, name):
+        name = name.strip().lower()
+        return self.masks.get(self.aliases.get(name, name))
+
+    # This method returns the (tonic pitch class, scale name) pairs whose notes contain the given
+    # pitch-class mask, ordered by tonic then catalogue order. The 12 transpositions are only tested
+    # once per family and shifted by bit rotation for each mode of the family
+    def find_scales_containing(self, input_mask):
+        input_masks = [rotate_mask(input_mask, -tonic) for tonic in range(12)]
+        tonics_by_family = {}
+        for family_mask in self.family_masks:
+            tonics = 0
+            for tonic, mask in enumerate(input_masks):
+                if not mask & ~family_mask:
+                    tonics |= 1 << tonic
+            tonics_by_family[family_mask] = tonics
+
+        matching_by_tonic = [[] for _ in range(12)]
+        for name, (family_mask, steps) in self.families.items():
+            tonics = tonics_by_family[family_mask]
+            if tonics:
+                for tonic in PITCH_CLASSES_BY_MASK[rotate_mask(tonics, steps)]:
+                    matching_by_tonic[tonic].append(name)
+
+        return [(tonic, name) for tonic in range(12) for name in matching_by_tonic[tonic]]
+
+# This function builds a catalogue from the given data files and directories.
+# An unreadable file or an invalid definition is skipped, recorded in the errors of the catalogue
+# and reported as a warning, so that the rest of the catalogue is still loaded
+def load_catalogue(paths):
+    catalogue = ScaleCatalogue()
+    for path in list_scale_files(paths):
+        try:
+            definitions = read_scales(path)
+        except (OSError, ValueError, TypeError, csv.Error) as error:
+            catalogue.errors.append(f"{path} : {error}")
+            warnings.warn(catalogue.errors[-1])
+            continue
+        for name, intervals in definitions:
+            try:
+                catalogue.add(name, intervals)
+            except ValueError as error:
+                catalogue.errors.append(f"{path} : {error}")
+                warnings.warn(catalogue.errors[-1])
+    return catalogue
+
+# Catalogue used by the programs, loaded from SCALES_DIR on first use
+_catalogue = None
+
+# This function returns the catalogue used by the programs
+def get_catalogue():
+    global _catalogue
+    if _catalogue is None:
+        _catalogue = load_catalogue([SCALES_DIR])
+    return _catalogue
+
+# This function replaces the catalogue used by the programs, e.g. with one loaded from other files
+def set_catalogue(catalogue):
+    global _catalogue
+    _catalogue = catalogue
+    clear_caches()